@@ -0,0 +1,7 @@
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name='mypyc_output',
+    ext_modules=mypycify(['tests/mock_stratum_server.py']),
+)
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Mock ZION Stratum pool server.
+
+Speaks just enough Stratum to exercise zion-miner against a local
+endpoint without a real pool: the XMRig-style login/getjob/submit
+methods plus classic mining.subscribe/authorize/submit. Jobs are
+synthetic (sha256 filler blobs), shares are always accepted, and the
+height advances on a fixed timer to simulate new blocks.
+
+Usage:
+    python3 tests/mock_stratum_server.py [port]
+
+Then point the miner at it:
+    zion-miner --pool stratum+tcp://127.0.0.1:3333 --wallet zion1test
+
+The module is fully typed so the per-message path can optionally be
+compiled with mypyc for high-connection-count runs:
+
+    mypyc tests/mock_stratum_server.py
+
+and the compiled extension is picked up transparently on next import.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections.abc import Callable
+from typing import Any, cast
+
+log = logging.getLogger("mock_stratum")
+
+# Session ids double as the extranonce1 handed out in mining.subscribe,
+# so they must be unique per connection, not per wall-clock second.
+_session_counter = itertools.count(1)
+
+_loads: Callable[..., Any]
+_dumps: Callable[..., bytes]
+
+try:
+    # Rust-backed JSON: several times faster both ways, and dumps()
+    # returns bytes so the str->bytes encode before write disappears.
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _stdlib_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _dumps = _stdlib_dumps
+
+try:
+    # Optional binary transport: ~30-50% smaller frames and faster
+    # encode/decode than JSON text. Miners opt in at login/subscribe.
+    import msgpack  # type: ignore[import-untyped]
+except ImportError:
+    msgpack = None
+
+try:
+    # libuv-based event loop: noticeably more miner sessions per core
+    # than the default selector loop. Purely optional.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None  # type: ignore[assignment]
+
+HOST = "0.0.0.0"
+PORT = 3333
+DIFFICULTY = 10000
+ALGO = "cosmic_harmony"
+BLOCK_TIME = 60  # seconds between height bumps, mirrors the mainnet target
+
+RECV_BUF = 65536
+
+# Immutable pieces of the job, formatted once at module load. make_job
+# itself only runs once per height thanks to the server-side cache, but
+# there is no reason to re-format constants even then.
+TARGET_HEX = f"{DIFFICULTY:08x}"
+SEED_HASH = "0" * 64
+_JOB_ID_SUFFIX = f"-{ALGO}"
+
+# Response skeletons for the hot paths. submit/keepalived/authorize
+# replies differ only in their id, so substituting the id into a
+# prebuilt bytes template skips the full json.dumps traversal that
+# would otherwise run for ~99% of server replies.
+_SUBMIT_TMPL = b'{"jsonrpc":"2.0","id":%b,"result":{"status":"OK"}}\n'
+_KEEPALIVED_TMPL = b'{"jsonrpc":"2.0","id":%b,"result":{"status":"KEEPALIVED"}}\n'
+_AUTHORIZE_TMPL = b'{"jsonrpc":"2.0","id":%b,"result":true}\n'
+_NOTIFY_TMPL = b'{"jsonrpc":"2.0","method":"job","params":%b}\n'
+
+
+def _setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route log records through a queue so formatting and the actual
+    write(2) happen on a worker thread, never on the event loop."""
+    q: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(q))
+    listener = logging.handlers.QueueListener(q, logging.StreamHandler())
+    listener.start()
+    return listener
+
+
+def _encode_id(msg_id: object) -> bytes:
+    """Encode a JSON-RPC id for splicing into a response template."""
+    if type(msg_id) is int:
+        return b"%d" % msg_id
+    return _dumps(msg_id)
+
+
+def make_job(height: int) -> dict:
+    """Build a synthetic job for the given height."""
+    ts = int(time.time())
+    digest = hashlib.sha256(b"zion-block-%d-%d" % (height, ts)).digest()
+    # 76 raw bytes hexed once == the old hexdigest*5 sliced to 152 chars,
+    # minus the repeated string building.
+    blob = (digest * 3)[:76].hex()
+    return {
+        "job_id": f"h{height}-{ts:08x}" + _JOB_ID_SUFFIX,
+        "blob": blob,
+        "target": TARGET_HEX,
+        "algo": ALGO,
+        "height": height,
+        "seed_hash": SEED_HASH,
+    }
+
+
+class StratumSession(asyncio.BufferedProtocol):
+    """One miner connection.
+
+    Receives straight into a preallocated bytearray and scans for
+    newline-framed messages in place, so no intermediate bytes object
+    is built per frame the way StreamReader.readline would.
+    """
+
+    def __init__(self, server: MockStratumServer) -> None:
+        self.server = server
+        self.transport: asyncio.Transport | None = None
+        self.peer: tuple | None = None
+        self.session_id = ""
+        self._buf = bytearray(RECV_BUF)
+        self._mv = memoryview(self._buf)
+        self._head = 0
+        self._tail = 0
+        self._out = bytearray()
+        self._use_msgpack = False
+        self._handlers: dict[str, Callable[[object, object], None]] = {
+            "login": self._on_login,
+            "getjob": self._on_getjob,
+            "submit": self._on_submit,
+            "mining.submit": self._on_submit,
+            "keepalived": self._on_keepalived,
+            "mining.subscribe": self._on_subscribe,
+            "mining.authorize": self._on_authorize,
+        }
+
+    # -- protocol callbacks ------------------------------------------------
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.Transport, transport)
+        self.peer = transport.get_extra_info("peername")
+        self.session_id = f"sess-{next(_session_counter):x}"
+        self.server.register(self)
+        log.info("[+] Miner connected: %s (%s)", self.peer, self.session_id)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.server.unregister(self)
+        log.info("[-] Miner disconnected: %s", self.peer)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self._tail == len(self._buf):
+            self._grow()
+        return self._mv[self._tail:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        # Drain every complete frame in the chunk before yielding, and
+        # coalesce all the replies into one write: submits and keepalives
+        # arrive in bursts, so this amortizes the scheduling overhead and
+        # syscalls over many messages.
+        self._tail += nbytes
+        while self._head < self._tail:
+            before = self._head
+            if self._use_msgpack:
+                self._scan_msgpack()
+            else:
+                self._scan_lines()
+            if self._head == before:
+                break  # partial frame left in the buffer
+        self._compact()
+        if self._out:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Hand the accumulated replies to the transport in one write."""
+        transport = self.transport
+        assert transport is not None  # only called with a live connection
+        mv = memoryview(self._out)
+        transport.write(mv)
+        mv.release()
+        try:
+            self._out.clear()
+        except BufferError:
+            # The transport kept a view on the buffer (uvloop does while
+            # a write is in flight); detach and start a fresh one.
+            self._out = bytearray()
+
+    def _scan_lines(self) -> None:
+        """Dispatch newline-framed JSON messages from the buffer."""
+        while not self._use_msgpack:
+            nl = self._buf.find(b"\n", self._head, self._tail)
+            if nl < 0:
+                return
+            line = bytes(self._mv[self._head:nl])
+            self._head = nl + 1
+            if line.strip():
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("[<] %s", line[:200])
+                try:
+                    msg = _loads(line)
+                except ValueError:
+                    continue
+                self._process_msg(msg)
+
+    def _scan_msgpack(self) -> None:
+        """Dispatch length-prefixed msgpack messages from the buffer."""
+        while self._tail - self._head >= 4:
+            size = int.from_bytes(self._buf[self._head:self._head + 4], "big")
+            if self._tail - self._head - 4 < size:
+                return
+            start = self._head + 4
+            frame = bytes(self._mv[start:start + size])
+            self._head = start + size
+            log.debug("[<] msgpack frame (%d bytes)", size)
+            try:
+                msg = msgpack.unpackb(frame, raw=False)
+            except Exception:
+                continue
+            self._process_msg(msg)
+
+    def eof_received(self) -> bool:
+        return False  # close the transport
+
+    # -- buffer management -------------------------------------------------
+
+    def _compact(self) -> None:
+        """Move any partial frame to the front so the buffer can refill."""
+        if self._head:
+            remaining = self._tail - self._head
+            if remaining:
+                self._buf[:remaining] = self._buf[self._head:self._tail]
+            self._head = 0
+            self._tail = remaining
+
+    def _grow(self) -> None:
+        """Double the buffer when a single frame overflows it."""
+        new = bytearray(len(self._buf) * 2)
+        new[:self._tail] = self._mv[:self._tail]
+        self._buf = new
+        self._mv = memoryview(self._buf)
+
+    # -- message handling --------------------------------------------------
+
+    def _process_msg(self, msg: dict[str, Any]) -> None:
+        method = msg.get("method")
+        handler = self._handlers.get(method) if isinstance(method, str) else None
+        if handler is None:
+            self._on_unknown(msg.get("id"), method)
+            return
+        handler(msg.get("id"), msg.get("params"))
+
+    # Each handler knows its expected params shape up front, so the hot
+    # paths skip the generic type guards entirely. submit/keepalived/
+    # authorize reply via the prebuilt templates; only login/getjob and
+    # notifies carry a dynamic job and still go through the encoder.
+
+    def _on_submit(self, msg_id: object, params: object) -> None:
+        self.server.shares += 1
+        log.debug("[*] Share #%d accepted (height %d)", self.server.shares, self.server.height)
+        self._emit_fast(_SUBMIT_TMPL, msg_id, {"status": "OK"})
+
+    def _on_keepalived(self, msg_id: object, params: object) -> None:
+        self._emit_fast(_KEEPALIVED_TMPL, msg_id, {"status": "KEEPALIVED"})
+
+    def _on_authorize(self, msg_id: object, params: object) -> None:
+        self._emit_fast(_AUTHORIZE_TMPL, msg_id, True)
+        self._emit_notify()
+
+    def _on_login(self, msg_id: object, params: object) -> None:
+        result = {
+            "id": self.session_id,
+            "job": self.server.get_job(),
+            "status": "OK",
+        }
+        wants_msgpack = self._wants_msgpack(params)
+        if wants_msgpack:
+            result["extensions"] = ["msgpack"]
+        self._emit(self._encode({"jsonrpc": "2.0", "id": msg_id, "result": result}))
+        if wants_msgpack:
+            self._switch_to_msgpack()
+
+    def _on_getjob(self, msg_id: object, params: object) -> None:
+        self._emit(self._encode({
+            "jsonrpc": "2.0",
+            "id": msg_id,
+            "result": self.server.get_job(),
+        }))
+
+    def _on_subscribe(self, msg_id: object, params: object) -> None:
+        self._emit(self._encode({
+            "jsonrpc": "2.0",
+            "id": msg_id,
+            "result": [
+                [["mining.set_difficulty", self.session_id],
+                 ["mining.notify", self.session_id]],
+                self.session_id,
+                4,
+            ],
+        }))
+        if self._wants_msgpack(params):
+            self._switch_to_msgpack()
+
+    def _on_unknown(self, msg_id: object, method: object) -> None:
+        self._emit(self._encode({
+            "jsonrpc": "2.0",
+            "id": msg_id,
+            "error": {"code": -32601, "message": f"Unknown method: {method}"},
+        }))
+
+    def _emit(self, frame: bytes) -> None:
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[>] %s", frame[:200])
+        self._out.extend(frame)
+
+    def _emit_fast(self, tmpl: bytes, msg_id: object, result: object) -> None:
+        """Hot-path reply: JSON sessions splice a prebuilt template,
+        msgpack sessions pack the small result dict directly."""
+        if self._use_msgpack:
+            frame = self._pack({"jsonrpc": "2.0", "id": msg_id, "result": result})
+        else:
+            frame = tmpl % _encode_id(msg_id)
+        self._emit(frame)
+
+    def _emit_notify(self) -> None:
+        if self._use_msgpack:
+            frame = self.server.get_notify_msgpack()
+        else:
+            frame = self.server.get_notify_json()
+        self._emit(frame)
+
+    def _encode(self, response: dict) -> bytes:
+        if self._use_msgpack:
+            return self._pack(response)
+        return _dumps(response) + b"\n"
+
+    @staticmethod
+    def _pack(obj: dict) -> bytes:
+        body = msgpack.packb(obj, use_bin_type=True)
+        return len(body).to_bytes(4, "big") + body
+
+    @staticmethod
+    def _wants_msgpack(params: object) -> bool:
+        if msgpack is None:
+            return False
+        if isinstance(params, dict):
+            ext = params.get("ext") or ()
+        else:
+            ext = params or ()
+        return "msgpack" in ext
+
+    def _switch_to_msgpack(self) -> None:
+        log.info("[*] %s switched to msgpack framing", self.session_id)
+        self._use_msgpack = True
+
+
+class MockStratumServer:
+    def __init__(self, host: str = HOST, port: int = PORT) -> None:
+        self.host = host
+        self.port = port
+        self.height = 1
+        self.shares = 0
+        self._sessions: set[StratumSession] = set()
+        self._job_cache: dict[int, dict] = {}
+        self._job_cache_json: dict[int, bytes] = {}
+        self._notify_cache: dict[tuple[int, str], bytes] = {}
+
+    def register(self, session: StratumSession) -> None:
+        self._sessions.add(session)
+
+    def unregister(self, session: StratumSession) -> None:
+        self._sessions.discard(session)
+
+    def get_job(self, height: int | None = None) -> dict:
+        """Return the job for a height, building it at most once.
+
+        Job inputs only change when the height advances, so login/getjob
+        and notify all share one cached dict (and its serialized bytes)
+        instead of redoing the sha256 + string work per request.
+        """
+        if height is None:
+            height = self.height
+        job = self._job_cache.get(height)
+        if job is None:
+            job = make_job(height)
+            self._job_cache[height] = job
+            self._job_cache_json[height] = _dumps(job)
+        return job
+
+    def get_job_json(self, height: int | None = None) -> bytes:
+        """Return the cached serialized job bytes for a height."""
+        if height is None:
+            height = self.height
+        if height not in self._job_cache_json:
+            self.get_job(height)
+        return self._job_cache_json[height]
+
+    def get_notify_json(self, height: int | None = None) -> bytes:
+        """Return the newline-framed notify bytes, built once per height."""
+        if height is None:
+            height = self.height
+        key = (height, "json")
+        frame = self._notify_cache.get(key)
+        if frame is None:
+            frame = _NOTIFY_TMPL % self.get_job_json(height)
+            self._notify_cache[key] = frame
+        return frame
+
+    def get_notify_msgpack(self, height: int | None = None) -> bytes:
+        """Return the length-prefixed msgpack notify frame for a height."""
+        if height is None:
+            height = self.height
+        key = (height, "msgpack")
+        frame = self._notify_cache.get(key)
+        if frame is None:
+            frame = StratumSession._pack({
+                "jsonrpc": "2.0",
+                "method": "job",
+                "params": self.get_job(height),
+            })
+            self._notify_cache[key] = frame
+        return frame
+
+    def broadcast_job(self) -> None:
+        """Push the current job to every connected miner.
+
+        The notify frame is encoded once per height per codec and the
+        same bytes object is written to every session: O(1) serialization
+        regardless of how many miners are connected.
+        """
+        for session in list(self._sessions):
+            session._emit_notify()
+            session._flush()
+
+    async def job_broadcaster(self) -> None:
+        """Advance the chain tip on a timer and fan the new job out."""
+        while True:
+            await asyncio.sleep(BLOCK_TIME)
+            self._job_cache.clear()
+            self._job_cache_json.clear()
+            self._notify_cache.clear()
+            self.height += 1
+            log.info("[*] New block: height %d (%d miners)", self.height, len(self._sessions))
+            self.broadcast_job()
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(
+            lambda: StratumSession(self), self.host, self.port
+        )
+        loop_name = "uvloop" if uvloop else "asyncio"
+        log.info("⚡ Mock ZION Stratum server on %s:%s (%s)", self.host, self.port, loop_name)
+        asyncio.ensure_future(self.job_broadcaster())
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "-v"]
+    _setup_logging(logging.DEBUG if "-v" in sys.argv else logging.INFO)
+    port = int(args[0]) if args else PORT
+    mock = MockStratumServer(port=port)
+    try:
+        asyncio.run(mock.start())
+    except KeyboardInterrupt:
+        log.info("[!] Shutting down")